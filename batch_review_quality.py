@@ -1,8 +1,9 @@
 import argparse
+import asyncio
 import sys
-from collections import defaultdict
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
 from dotenv import load_dotenv
 
@@ -18,9 +19,20 @@ _add_src_to_path()
 
 from config import Config  # noqa: E402
 from services.quality_reviewer import dump_report_json, now_tag  # noqa: E402
-from utils import LLMService  # noqa: E402
+from services.judge_cache import JudgeCache, make_judge_cache  # noqa: E402
+from services.model_cache import ModelMemo  # noqa: E402
+from services.rate_limiter import AsyncRateLimiter  # noqa: E402
 
-from review_quality import iter_json_files, review_cloze_files, review_reading_files  # noqa: E402
+from review_quality import (  # noqa: E402
+    iter_json_files,
+    make_limiter,
+    make_rule_check_pool,
+    review_cloze_files,
+    review_reading_files,
+)
+
+if TYPE_CHECKING:  # imported lazily in main() only with --llm; utils pulls in the LLM SDKs
+    from utils import LLMService
 
 
 def _infer_model_name(path: Path) -> str:
@@ -31,16 +43,15 @@ def _infer_model_name(path: Path) -> str:
     - official__ClozeTest.json -> official
     """
     stem = path.stem  # without .json
-    if "_" in stem:
-        return stem.split("_", 1)[0].strip() or "unknown"
-    return stem.strip() or "unknown"
+    return stem.partition("_")[0].strip() or "unknown"
 
 
 def _group_by_model(files: List[Path]) -> Dict[str, List[Path]]:
-    groups: Dict[str, List[Path]] = defaultdict(list)
+    # `files` is already sorted, so each group keeps that order.
+    groups: Dict[str, List[Path]] = {}
     for p in files:
-        groups[_infer_model_name(p)].append(p)
-    return dict(groups)
+        groups.setdefault(_infer_model_name(p), []).append(p)
+    return groups
 
 
 def _all_models(*group_dicts: Dict[str, List[Path]]) -> List[str]:
@@ -50,16 +61,48 @@ def _all_models(*group_dicts: Dict[str, List[Path]]) -> List[str]:
     return sorted(models)
 
 
+async def _review_models(
+    models: List[str],
+    cloze_by_model: Dict[str, List[Path]],
+    reading_by_model: Dict[str, List[Path]],
+    llm: Optional["LLMService"],
+    limiter: AsyncRateLimiter,
+    batch_size: int,
+    cache: Optional[JudgeCache],
+) -> Dict[str, Tuple[Tuple[List[Dict[str, Any]], Dict[str, Any]], Tuple[List[Dict[str, Any]], Dict[str, Any]]]]:
+    # Every (model, cloze|reading) job runs concurrently; the shared limiter keeps the provider budget.
+    # Models often ship the same benchmark items, so a shared dedup map judges each distinct item once.
+    # All jobs share one rule-check process pool rather than starting one each, and one memo
+    # so a benchmark file shipped under several models is validated once.
+    dedup: Dict[str, "asyncio.Future[Any]"] = {}
+    memo: ModelMemo = {}
+    with make_rule_check_pool() or nullcontext() as pool:
+        cloze_jobs = [review_cloze_files(cloze_by_model.get(m, []), llm, limiter, batch_size, cache, dedup, pool, memo) for m in models]
+        reading_jobs = [review_reading_files(reading_by_model.get(m, []), llm, limiter, batch_size, cache, dedup, pool, memo) for m in models]
+        results = await asyncio.gather(*cloze_jobs, *reading_jobs)
+    n = len(models)
+    return {m: (results[i], results[n + i]) for i, m in enumerate(models)}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Batch review all models' json files under data/, producing one report per model.")
     parser.add_argument("--cloze-dir", default="data/clozetest/1", help="Directory containing ClozeTest json files.")
     parser.add_argument("--reading-dir", default="data/readintask/1", help="Directory containing ReadingTask json files.")
     parser.add_argument("--out-dir", default="outputs/by_model", help="Directory to write per-model reports.")
     parser.add_argument("--llm", action="store_true", help="Enable LLM judging (requires API config).")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Max LLM judge calls in flight (with --llm).")
+    parser.add_argument("--rpm", type=int, default=None, help="Max LLM judge calls per minute. Default: per-provider value in Config; 0 = unlimited.")
+    parser.add_argument("--judge-batch-size", type=int, default=1, help="Items per LLM judge call (with --llm). 1 = one call per item.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read/write the LLM judge verdict cache (outputs/.judge_cache).")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Ignore cached verdicts older than this many seconds. Default: never expire.")
     args = parser.parse_args()
 
     config = Config()
-    llm = LLMService(config) if args.llm else None
+    llm = None
+    if args.llm:
+        from utils import LLMService
+
+        llm = LLMService(config)
     ts = now_tag()
 
     cloze_files = iter_json_files(Path(args.cloze_dir))
@@ -76,12 +119,15 @@ def main() -> int:
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    for model in models:
-        model_cloze = cloze_by_model.get(model, [])
-        model_reading = reading_by_model.get(model, [])
+    limiter = make_limiter(config, args.max_concurrency, args.rpm)
+    cache = make_judge_cache(llm, enabled=not args.no_cache, ttl=args.cache_ttl)
+    results = asyncio.run(_review_models(models, cloze_by_model, reading_by_model, llm, limiter, args.judge_batch_size, cache))
+
+    # `ts` is formatted once; only the model name varies per report path.
+    out_prefix = str(out_dir / "quality_report_")
 
-        cloze_items, cloze_totals = review_cloze_files(model_cloze, llm)
-        reading_items, reading_totals = review_reading_files(model_reading, llm)
+    for model in models:
+        (cloze_items, cloze_totals), (reading_items, reading_totals) = results[model]
 
         report = {
             "generated_at": ts,
@@ -97,7 +143,7 @@ def main() -> int:
             "items": cloze_items + reading_items,
         }
 
-        out_path = out_dir / f"quality_report_{model}_{ts}.json"
+        out_path = Path(f"{out_prefix}{model}_{ts}.json")
         dump_report_json(out_path, report)
         print(f"Saved report ({model}): {out_path}")
 
@@ -1,13 +1,35 @@
 import argparse
-import json
+import os
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional
 
-from summarize_quality_report import summarize_report
+from summarize_quality_report import dump_json, read_report, summarize_report
 
 
-def _read_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+def _write_json(path: Path, obj: Any) -> None:
+    path.write_bytes(dump_json(obj))
+
+
+class _JsonArrayWriter:
+    """
+    Write a JSON array element by element, so the combined index never has to be held in memory.
+    Output has the same layout as dump_json() of the whole list (indent=2).
+    """
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._first = True
+        f.write(b"[")
+
+    def append(self, obj: Any) -> None:
+        self._f.write(b"\n  " if self._first else b",\n  ")
+        self._first = False
+        # Nest one level deeper; JSON strings cannot contain raw newlines, so this only touches layout.
+        self._f.write(dump_json(obj).replace(b"\n", b"\n  "))
+
+    def close(self) -> None:
+        self._f.write(b"]" if self._first else b"\n]")
 
 
 def _iter_reports(dir_path: Path) -> List[Path]:
@@ -16,6 +38,29 @@ def _iter_reports(dir_path: Path) -> List[Path]:
     return sorted([p for p in dir_path.rglob("*.json") if p.is_file() and "quality_report_" in p.name])
 
 
+def _summarize_one(report_path: Path, out_dir: Path, combined: Optional[_JsonArrayWriter]) -> None:
+    report, items = read_report(report_path)
+    summary: Dict[str, Any] = summarize_report(report, items)
+
+    model = str(report.get("model") or "unknown")
+    ts = str(report.get("generated_at") or report_path.stem.replace("quality_report_", ""))
+    out_path = out_dir / f"summary_{model}_{ts}.json"
+    _write_json(out_path, summary)
+    print(f"Saved summary: {out_path}")
+
+    if combined is not None:
+        combined.append(
+            {
+                "report": str(report_path),
+                "summary": str(out_path),
+                "model": model,
+                "generated_at": summary.get("generated_at"),
+                "counts": summary.get("counts"),
+                "overall": summary.get("overall"),
+            }
+        )
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Generate a summary for every quality_report_*.json in a directory.")
     parser.add_argument("--reports-dir", default="outputs/by_model", help="Directory containing per-model reports.")
@@ -36,33 +81,21 @@ def main() -> int:
     out_dir = Path(args.out_dir) if args.out_dir else (reports_dir / "summaries")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    combined: List[Dict[str, Any]] = []
-
-    for report_path in report_files:
-        report = _read_json(report_path)
-        summary: Dict[str, Any] = summarize_report(report)
-
-        model = str(report.get("model") or "unknown")
-        ts = str(report.get("generated_at") or report_path.stem.replace("quality_report_", ""))
-        out_path = out_dir / f"summary_{model}_{ts}.json"
-        out_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
-        print(f"Saved summary: {out_path}")
-
-        combined.append(
-            {
-                "report": str(report_path),
-                "summary": str(out_path),
-                "model": model,
-                "generated_at": summary.get("generated_at"),
-                "counts": summary.get("counts"),
-                "overall": summary.get("overall"),
-            }
-        )
-
-    if args.combined_out:
-        combined_out = Path(args.combined_out)
+    combined_out = Path(args.combined_out) if args.combined_out else None
+    if combined_out is not None:
         combined_out.parent.mkdir(parents=True, exist_ok=True)
-        combined_out.write_text(json.dumps(combined, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    # Stream into a temp file and swap it in at the end, so a crash mid-run keeps the previous index.
+    combined_tmp = combined_out.with_suffix(".tmp") if combined_out is not None else None
+    with combined_tmp.open("wb") if combined_tmp is not None else nullcontext() as combined_f:
+        combined = _JsonArrayWriter(combined_f) if combined_f is not None else None
+        for report_path in report_files:
+            _summarize_one(report_path, out_dir, combined)
+        if combined is not None:
+            combined.close()
+
+    if combined_out is not None:
+        os.replace(combined_tmp, combined_out)
         print(f"Saved combined index: {combined_out}")
 
     return 0
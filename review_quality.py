@@ -1,9 +1,16 @@
 import argparse
-import json
+import asyncio
+import hashlib
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type, TypeVar
 from dotenv import load_dotenv
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 load_dotenv()
 
@@ -17,24 +24,36 @@ _add_src_to_path()
 from config import Config  # noqa: E402
 from model import ClozeTest, ReadingTask  # noqa: E402
 from services.quality_reviewer import (  # noqa: E402
+    ClozeLLMJudgement,
+    ReadingLLMJudgement,
+    cloze_judge_prompts,
     dump_report_json,
     issues_to_dict,
-    llm_judge_cloze,
-    llm_judge_reading,
+    llm_judge_cloze_async,
+    llm_judge_cloze_batch_async,
+    llm_judge_reading_async,
+    llm_judge_reading_batch_async,
     now_tag,
     overall_score,
+    reading_judge_prompts,
     rule_check_cloze,
     rule_check_reading,
 )
-from utils import LLMService  # noqa: E402
+from services.judge_cache import JudgeCache, make_judge_cache  # noqa: E402
+from services.json_io import json_loads  # noqa: E402
+from services.model_cache import ModelMemo, load_cached  # noqa: E402
+from services.rate_limiter import AsyncRateLimiter, default_rpm  # noqa: E402
 
-
-def load_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+if TYPE_CHECKING:  # imported lazily in main() only with --llm; utils pulls in the LLM SDKs
+    from utils import LLMService
 
 
 T = TypeVar("T")
 
+_LOAD_WORKERS = 16
+_RULE_CHECK_POOL_MIN_ITEMS = 256
+_RULE_CHECK_CHUNK_SIZE = 16
+
 
 def _unwrap_list_container(raw: Any) -> Any:
     if isinstance(raw, dict):
@@ -45,117 +64,351 @@ def _unwrap_list_container(raw: Any) -> Any:
     return raw
 
 
-def _load_models_from_file(path: Path, model_cls: Type[T]) -> List[T]:
-    raw = _unwrap_list_container(load_json(path))
+@lru_cache(maxsize=None)
+def _list_adapter(model_cls: Type[T]) -> TypeAdapter:
+    # Validates a whole list in one pydantic-core call instead of one model construction per item.
+    return TypeAdapter(List[model_cls])
+
+
+def _parse_models(data: bytes, path: Path, model_cls: Type[T]) -> List[T]:
+    raw = _unwrap_list_container(json_loads(data))
     if isinstance(raw, list):
-        return [model_cls(**x) for x in raw]
+        return _list_adapter(model_cls).validate_python(raw)
     if isinstance(raw, dict):
-        return [model_cls(**raw)]
+        return [model_cls.model_validate(raw)]
     raise ValueError(f"Unsupported JSON top-level in {path}: {type(raw).__name__}")
 
 
-def iter_json_files(dir_path: Path) -> List[Path]:
-    if not dir_path.exists():
-        return []
-    return sorted([p for p in dir_path.rglob("*.json") if p.is_file()])
+def _load_models_from_file(path: Path, model_cls: Type[T], memo: Optional[ModelMemo]) -> List[T]:
+    # Byte-identical files are validated once per run; see services/model_cache.py.
+    return load_cached(path, model_cls, lambda data: _parse_models(data, path, model_cls), memo)
+
 
+def _load_all(files: List[Path], model_cls: Type[T], memo: Optional[ModelMemo]) -> List[Tuple[Path, int, T]]:
+    # Reading/decoding is I/O-bound, so overlap it across files; result order follows `files`.
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(_LOAD_WORKERS, len(files))) as ex:
+            per_file = list(ex.map(lambda p: _load_models_from_file(p, model_cls, memo), files))
+    else:
+        per_file = [_load_models_from_file(p, model_cls, memo) for p in files]
+    return [(path, idx, m) for path, models in zip(files, per_file) for idx, m in enumerate(models)]
 
-def review_cloze_files(files: List[Path], llm: Optional[LLMService]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+
+def iter_json_files(dir_path: Path) -> List[Path]:
+    # os.walk + str filtering is much cheaper than rglob on large trees; only matches become Paths.
+    # os.walk also lists broken symlinks, so matches keep the baseline's is-a-file check.
+    # Sorting on path components keeps the same order as sorting Path objects.
+    found = [
+        path
+        for root, _dirs, names in os.walk(dir_path)
+        for name in names
+        if name.endswith(".json") and os.path.isfile(path := os.path.join(root, name))
+    ]
+    found.sort(key=lambda s: s.split(os.sep))
+    return [Path(s) for s in found]
+
+
+class _JudgeKind(NamedTuple):
+    # How to judge one kind of item (cloze / reading); lets the helpers below stay kind-agnostic.
+    label: str
+    prompts: Callable[[Any], Tuple[str, str]]
+    schema: Type[BaseModel]
+    judge_one: Callable[[Any, "LLMService"], Awaitable[Any]]
+    judge_batch: Callable[[List[Any], "LLMService"], Awaitable[List[Any]]]
+
+
+_CLOZE_JUDGE = _JudgeKind("cloze items", cloze_judge_prompts, ClozeLLMJudgement, llm_judge_cloze_async, llm_judge_cloze_batch_async)
+_READING_JUDGE = _JudgeKind("reading tasks", reading_judge_prompts, ReadingLLMJudgement, llm_judge_reading_async, llm_judge_reading_batch_async)
+
+
+async def _judge_one_async(kind: _JudgeKind, item: Any, llm: "LLMService", limiter: Optional[AsyncRateLimiter]) -> Any:
+    async with limiter or nullcontext():
+        return await kind.judge_one(item, llm)
+
+
+async def _judge_uncached_async(
+    kind: _JudgeKind, items: List[Any], llm: "LLMService", limiter: Optional[AsyncRateLimiter]
+) -> Tuple[List[Any], bool]:
+    # One call for the whole batch; on a bad/short reply fall back to one call per item.
+    # Also returns whether the verdicts came from a batched prompt.
+    if len(items) > 1:
+        try:
+            async with limiter or nullcontext():
+                return await kind.judge_batch(items, llm), True
+        except Exception as e:
+            print(f"Batched judging of {len(items)} {kind.label} failed ({e!r}); retrying one by one.")
+    return await asyncio.gather(*(_judge_one_async(kind, it, llm, limiter) for it in items), return_exceptions=True), False
+
+
+async def _judge_batch_async(
+    kind: _JudgeKind, items: List[Any], llm: "LLMService", limiter: Optional[AsyncRateLimiter], cache: Optional[JudgeCache]
+) -> List[Any]:
+    # Serve cached verdicts first (without taking a limiter slot), then judge only the misses.
+    # Keys are the single-item prompt, so only verdicts judged from exactly that prompt are
+    # written back; verdicts from a batched prompt are used for this run only.
+    keys = [cache.key(*kind.prompts(it), kind.schema) for it in items] if cache else [None] * len(items)
+    results: List[Any] = [None] * len(items)
+    pending: List[int] = []
+    for i, key in enumerate(keys):
+        hit = cache.get(key) if cache else None
+        if hit is not None:
+            try:
+                results[i] = kind.schema.model_validate(hit)
+                continue
+            except ValidationError as e:
+                # e.g. a hand-edited entry; treat it as a miss like unreadable JSON in FileBackend.get.
+                print(f"Ignoring invalid cached verdict {key}: {e.error_count()} validation error(s)")
+                cache.reject(key)
+        pending.append(i)
+
+    judged, batched = await _judge_uncached_async(kind, [items[i] for i in pending], llm, limiter) if pending else ([], False)
+    for i, judgement in zip(pending, judged):
+        results[i] = judgement
+        if cache and not batched and not isinstance(judgement, BaseException):
+            cache.set(keys[i], judgement.model_dump(mode="json"))
+    return results
+
+
+def _item_key(kind: _JudgeKind, item: BaseModel) -> str:
+    # The verdict depends only on the item content, not on which file/model it came from.
+    return hashlib.sha256(f"{kind.label}\0{item.model_dump_json()}".encode("utf-8")).hexdigest()
+
+
+async def _judge_all_async(
+    kind: _JudgeKind,
+    items: List[Any],
+    llm: Optional["LLMService"],
+    limiter: Optional[AsyncRateLimiter],
+    batch_size: int,
+    cache: Optional[JudgeCache],
+    dedup: Optional[Dict[str, "asyncio.Future[Any]"]] = None,
+) -> List[Any]:
+    # Judgement (or exception) per item, in input order; all None when LLM judging is off.
+    # Identical items are judged once: `dedup` maps content key -> verdict future, and sharing
+    # one dict across concurrent calls (e.g. one per model) extends that to the whole run.
+    if llm is None:
+        return [None] * len(items)
+    dedup = {} if dedup is None else dedup
+    keys = [_item_key(kind, it) for it in items]
+    loop = asyncio.get_running_loop()
+    fresh: Dict[str, Any] = {}
+    for key, it in zip(keys, items):
+        if key not in dedup:
+            dedup[key] = loop.create_future()
+            fresh[key] = it
+
+    if fresh:
+        try:
+            results = await asyncio.gather(
+                *(_judge_batch_async(kind, b, llm, limiter, cache) for b in _chunked(list(fresh.values()), batch_size))
+            )
+        except BaseException:
+            for key in fresh:
+                dedup[key].cancel()
+            raise
+        for key, judgement in zip(fresh, (j for batch in results for j in batch)):
+            dedup[key].set_result(judgement)
+    return [await dedup[key] for key in keys]
+
+
+def _rule_check_chunk(check: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+    return [check(it) for it in items]
+
+
+def make_rule_check_pool() -> Optional[ProcessPoolExecutor]:
+    # One pool per run, shared by every review job; worker processes only start on first use.
+    workers = os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+
+async def _rule_check_all_async(check: Callable[[Any], Any], items: List[Any], pool: Optional[ProcessPoolExecutor]) -> List[Any]:
+    # Rule checks are pure CPU (~0.1-0.5 ms/item). Below the threshold, pickling to the pool
+    # costs more than it saves, so small inputs stay inline.
+    if pool is None or len(items) < _RULE_CHECK_POOL_MIN_ITEMS:
+        return _rule_check_chunk(check, items)
+    loop = asyncio.get_running_loop()
+    chunks = _chunked(items, _RULE_CHECK_CHUNK_SIZE)
+    results = await asyncio.gather(*(loop.run_in_executor(pool, _rule_check_chunk, check, c) for c in chunks))
+    return [r for chunk in results for r in chunk]
+
+
+def _chunked(seq: List[T], size: int) -> Iterator[List[T]]:
+    it = iter(seq)
+    while chunk := list(islice(it, max(1, size))):
+        yield chunk
+
+
+def _judgement_to_dict(judgement: Any, where: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    # Split a gather() result into (llm_judge, llm_error); a failed item must not sink the whole run.
+    if judgement is None:
+        return None, None
+    if isinstance(judgement, BaseException):
+        print(f"LLM judging failed for {where}: {judgement!r}")
+        return None, repr(judgement)
+    return judgement.model_dump(), None
+
+
+async def review_cloze_files(
+    files: List[Path],
+    llm: Optional["LLMService"],
+    limiter: Optional[AsyncRateLimiter] = None,
+    batch_size: int = 1,
+    cache: Optional[JudgeCache] = None,
+    dedup: Optional[Dict[str, "asyncio.Future[Any]"]] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+    models_memo: Optional[ModelMemo] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     per_item: List[Dict[str, Any]] = []
     totals = {"count": 0, "fatal": 0, "warning": 0, "info": 0, "avg_score": 0.0}
     scores: List[float] = []
 
-    for path in files:
-        items = _load_models_from_file(path, ClozeTest)
-        for idx, item in enumerate(items):
-            issues, stats = rule_check_cloze(item)
-
-            llm_judge = None
-            if llm is not None:
-                llm_judge = llm_judge_cloze(item, llm).model_dump()
-
-            score = overall_score(issues, llm_judge.get("overall_score") if llm_judge else None)
-            scores.append(score)
-
-            per_item.append(
-                {
-                    "type": "cloze",
-                    "path": f"{path}#{idx}",
-                    "source_file": str(path),
-                    "index_in_file": idx,
-                    "id": item.id,
-                    "score": score,
-                    "rule_issues": issues_to_dict(issues),
-                    "rule_stats": stats,
-                    "llm_judge": llm_judge,
-                }
-            )
+    loaded = _load_all(files, ClozeTest, models_memo)
 
-            totals["count"] += 1
-            totals["fatal"] += stats.get("fatal_count", 0)
-            totals["warning"] += stats.get("warning_count", 0)
-            totals["info"] += stats.get("info_count", 0)
+    items = [item for _, _, item in loaded]
+    rule_results, judgements = await asyncio.gather(
+        _rule_check_all_async(rule_check_cloze, items, pool),
+        _judge_all_async(_CLOZE_JUDGE, items, llm, limiter, batch_size, cache, dedup),
+    )
+
+    for (path, idx, item), (issues, stats), judgement in zip(loaded, rule_results, judgements):
+        llm_judge, llm_error = _judgement_to_dict(judgement, f"{path}#{idx}")
+
+        score = overall_score(issues, llm_judge.get("overall_score") if llm_judge else None)
+        scores.append(score)
+
+        per_item.append(
+            {
+                "type": "cloze",
+                "path": f"{path}#{idx}",
+                "source_file": str(path),
+                "index_in_file": idx,
+                "id": item.id,
+                "score": score,
+                "rule_issues": issues_to_dict(issues),
+                "rule_stats": stats,
+                "llm_judge": llm_judge,
+                "llm_error": llm_error,
+            }
+        )
+
+        totals["count"] += 1
+        totals["fatal"] += stats.get("fatal_count", 0)
+        totals["warning"] += stats.get("warning_count", 0)
+        totals["info"] += stats.get("info_count", 0)
 
     totals["avg_score"] = (sum(scores) / len(scores)) if scores else 0.0
     return per_item, totals
 
 
-def review_reading_files(files: List[Path], llm: Optional[LLMService]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+async def review_reading_files(
+    files: List[Path],
+    llm: Optional["LLMService"],
+    limiter: Optional[AsyncRateLimiter] = None,
+    batch_size: int = 1,
+    cache: Optional[JudgeCache] = None,
+    dedup: Optional[Dict[str, "asyncio.Future[Any]"]] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+    models_memo: Optional[ModelMemo] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     per_item: List[Dict[str, Any]] = []
     totals = {"count": 0, "fatal": 0, "warning": 0, "info": 0, "avg_score": 0.0}
     scores: List[float] = []
 
-    for path in files:
-        tasks = _load_models_from_file(path, ReadingTask)
-        for idx, task in enumerate(tasks):
-            issues, stats = rule_check_reading(task)
-
-            llm_judge = None
-            if llm is not None:
-                llm_judge = llm_judge_reading(task, llm).model_dump()
-
-            score = overall_score(issues, llm_judge.get("overall_score") if llm_judge else None)
-            scores.append(score)
-
-            per_item.append(
-                {
-                    "type": "reading",
-                    "path": f"{path}#{idx}",
-                    "source_file": str(path),
-                    "index_in_file": idx,
-                    "title": task.title,
-                    "score": score,
-                    "rule_issues": issues_to_dict(issues),
-                    "rule_stats": stats,
-                    "llm_judge": llm_judge,
-                }
-            )
+    loaded = _load_all(files, ReadingTask, models_memo)
 
-            totals["count"] += 1
-            totals["fatal"] += stats.get("fatal_count", 0)
-            totals["warning"] += stats.get("warning_count", 0)
-            totals["info"] += stats.get("info_count", 0)
+    tasks = [task for _, _, task in loaded]
+    rule_results, judgements = await asyncio.gather(
+        _rule_check_all_async(rule_check_reading, tasks, pool),
+        _judge_all_async(_READING_JUDGE, tasks, llm, limiter, batch_size, cache, dedup),
+    )
+
+    for (path, idx, task), (issues, stats), judgement in zip(loaded, rule_results, judgements):
+        llm_judge, llm_error = _judgement_to_dict(judgement, f"{path}#{idx}")
+
+        score = overall_score(issues, llm_judge.get("overall_score") if llm_judge else None)
+        scores.append(score)
+
+        per_item.append(
+            {
+                "type": "reading",
+                "path": f"{path}#{idx}",
+                "source_file": str(path),
+                "index_in_file": idx,
+                "title": task.title,
+                "score": score,
+                "rule_issues": issues_to_dict(issues),
+                "rule_stats": stats,
+                "llm_judge": llm_judge,
+                "llm_error": llm_error,
+            }
+        )
+
+        totals["count"] += 1
+        totals["fatal"] += stats.get("fatal_count", 0)
+        totals["warning"] += stats.get("warning_count", 0)
+        totals["info"] += stats.get("info_count", 0)
 
     totals["avg_score"] = (sum(scores) / len(scores)) if scores else 0.0
     return per_item, totals
 
 
+def make_limiter(config: Config, max_concurrency: int, rpm: Optional[int]) -> AsyncRateLimiter:
+    # --rpm overrides the per-provider default from Config; 0 disables RPM spacing.
+    return AsyncRateLimiter(max_concurrency, default_rpm(config) if rpm is None else rpm)
+
+
+async def review_all(
+    cloze_files: List[Path],
+    reading_files: List[Path],
+    llm: Optional["LLMService"],
+    limiter: Optional[AsyncRateLimiter] = None,
+    batch_size: int = 1,
+    cache: Optional[JudgeCache] = None,
+) -> Tuple[Tuple[List[Dict[str, Any]], Dict[str, Any]], Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    # Cloze and reading share one limiter so concurrency/RPM bounds apply to all in-flight LLM calls,
+    # one process pool for the rule checks, and one memo of parsed data files.
+    models_memo: ModelMemo = {}
+    with make_rule_check_pool() or nullcontext() as pool:
+        cloze, reading = await asyncio.gather(
+            review_cloze_files(cloze_files, llm, limiter, batch_size, cache, pool=pool, models_memo=models_memo),
+            review_reading_files(reading_files, llm, limiter, batch_size, cache, pool=pool, models_memo=models_memo),
+        )
+    return cloze, reading
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Review AI-generated cloze + reading quality (考研英语).")
     parser.add_argument("--cloze-dir", default="data/clozetest/gpt5", help="Directory of ClozeTest json files.")
     parser.add_argument("--reading-dir", default="data/readintask/gpt5", help="Directory of ReadingTask json files.")
     parser.add_argument("--out", default=None, help="Output report path (json). Default: outputs/quality_report_<ts>.json")
     parser.add_argument("--llm", action="store_true", help="Enable LLM judging (requires API config).")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Max LLM judge calls in flight (with --llm).")
+    parser.add_argument("--rpm", type=int, default=None, help="Max LLM judge calls per minute. Default: per-provider value in Config; 0 = unlimited.")
+    parser.add_argument("--judge-batch-size", type=int, default=1, help="Items per LLM judge call (with --llm). 1 = one call per item.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read/write the LLM judge verdict cache (outputs/.judge_cache).")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Ignore cached verdicts older than this many seconds. Default: never expire.")
     args = parser.parse_args()
 
     config = Config()
-    llm = LLMService(config) if args.llm else None
+    llm = None
+    if args.llm:
+        from utils import LLMService
+
+        llm = LLMService(config)
 
     cloze_files = iter_json_files(Path(args.cloze_dir))
     reading_files = iter_json_files(Path(args.reading_dir))
 
-    cloze_items, cloze_totals = review_cloze_files(cloze_files, llm)
-    reading_items, reading_totals = review_reading_files(reading_files, llm)
+    (cloze_items, cloze_totals), (reading_items, reading_totals) = asyncio.run(
+        review_all(
+            cloze_files,
+            reading_files,
+            llm,
+            make_limiter(config, args.max_concurrency, args.rpm),
+            args.judge_batch_size,
+            make_judge_cache(llm, enabled=not args.no_cache, ttl=args.cache_ttl),
+        )
+    )
 
     report = {
         "generated_at": now_tag(),
@@ -1,15 +1,19 @@
 # config.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
-@dataclass
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_DATA_DIR = _REPO_ROOT / "data"
+_RUNS_DIR = _REPO_ROOT / "runs"
+
+@dataclass(frozen=True, slots=True)
 class Config:
     max_loop: int = 15
     batchsize: int = 10 # 没用到
     searchdocs: int = 10  #搜索到的相关文档数量
     run_times: int = 1  # current run number (for directory naming)
-    database_path: str = Path(__file__).resolve().parent.parent / "data"
-    run_directory: str = Path(__file__).resolve().parent.parent / "runs"
+    database_path: Path = _DATA_DIR
+    run_directory: Path = _RUNS_DIR
     case_dir: str = ""
     max_time_limit: int = 3600 # Max time limit after which the openfoam run will be terminated, in seconds
     file_dependency_threshold: int = 3000 # threshold length on the similar case; see `nodes/architect_node.py` for details
@@ -17,6 +21,16 @@ class Config:
     # model_version should be in ["gpt-4o", "deepseek-r1:32b-qwen-distill-fp16", "qwen2.5:32b-instruct"]
     model_version: str = "deepseek-chat"
     temperature: float = 1.0
+    # Requests-per-minute budget for LLM judging, keyed by model family or provider; see `services/rate_limiter.py`
+    provider_rpm: dict[str, int] = field(default_factory=lambda: {"openai": 500, "deepseek": 200, "bedrock": 100, "ollama": 0})
+    # Keep-alive connection pool shared by all calls of one LLMService; see `LLMService._client_kwargs`
+    # (defaults match the OpenAI SDK's own pool)
+    http_max_connections: int = 1000
+    http_max_keepalive: int = 100
+    # LangChain response cache, only used at temperature == 0; empty path = in-memory (SQLite needs langchain_community)
+    llm_cache: bool = True
+    llm_cache_path: str = ""
+    track_tokens: bool = True  # count prompt/completion tokens for LLMService statistics
     
     
 ##claude-haiku-4-5-20251001
@@ -0,0 +1,31 @@
+"""
+JSON helpers shared by the review/summary scripts and the services.
+
+orjson (pinned in requirement.txt) is used when installed, otherwise the stdlib json.
+Both give the same layout (indent=2, UTF-8, non-ASCII unescaped), but not identical
+bytes: float spelling differs (orjson writes 1e-05 as 0.00001 and 1e+20 as 1e20).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def read_json(path: Path) -> Any:
+    return json_loads(Path(path).read_bytes())
+
+
+def dump_json(obj: Any) -> bytes:
+    # indent=2, UTF-8, non-ASCII unescaped; int dict keys become strings.
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
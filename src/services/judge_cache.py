@@ -0,0 +1,141 @@
+"""
+Content-addressed cache for LLM judge verdicts.
+
+A verdict is keyed on sha256 over the exact (system prompt, user prompt,
+output schema, judge model, temperature), so an unchanged item re-reviewed
+with the same judge settings is served from cache instead of the API. The
+schema part covers its JSON schema, so changing a judgement model's fields
+invalidates older entries.
+
+Layout:
+- `LLMCache`: minimal get/set protocol for storage backends.
+- `FileBackend`: one JSON file per key under `outputs/.judge_cache/`, with optional TTL.
+- `JudgeCache`: in-memory layer in front of a backend, plus key derivation.
+
+Only deterministic judging (temperature == 0) is cached; see `make_judge_cache`.
+"""
+
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Dict, Optional, Protocol, Type
+
+from pydantic import BaseModel
+
+DEFAULT_CACHE_DIR = Path("outputs") / ".judge_cache"
+
+
+class LLMCache(Protocol):
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def set(self, key: str, value: Dict[str, Any]) -> None: ...
+
+
+class FileBackend:
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, ttl: Optional[float] = None):
+        self.root = Path(root)
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        # Write then rename so a concurrent reader never sees a half-written file.
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            # Best-effort, like get(): a failed write must not abort a run whose verdicts are already paid for.
+            print(f"Judge cache write failed for {path}: {e!r}")
+            with suppress(OSError):
+                tmp.unlink()
+
+
+@lru_cache(maxsize=None)
+def _schema_digest(schema: Type[BaseModel]) -> str:
+    # Changes whenever the judgement model's fields do, so old verdicts stop matching.
+    return hashlib.sha256(json.dumps(schema.model_json_schema(), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class JudgeCache:
+    def __init__(self, backend: LLMCache, model_provider: str, model_version: str, temperature: float):
+        self.backend = backend
+        self.model_provider = model_provider
+        self.model_version = model_version
+        self.temperature = temperature
+        self.hits = 0
+        self.misses = 0
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    def key(self, system_prompt: str, user_prompt: str, schema: Type[BaseModel]) -> str:
+        canonical = json.dumps(
+            {
+                "system": system_prompt,
+                "user": user_prompt,
+                "schema": schema.__name__,
+                "schema_digest": _schema_digest(schema),
+                "model_provider": self.model_provider,
+                "model_version": self.model_version,
+                "temperature": self.temperature,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._memory.get(key)
+        if value is None:
+            value = self.backend.get(key)
+            if value is not None:
+                self._memory[key] = value
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def reject(self, key: str) -> None:
+        # The value just returned by get() turned out unusable: forget it and count a miss instead.
+        self._memory.pop(key, None)
+        self.hits -= 1
+        self.misses += 1
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory[key] = value
+        self.backend.set(key, value)
+
+
+def make_judge_cache(llm: Optional[object], enabled: bool = True, ttl: Optional[float] = None) -> Optional[JudgeCache]:
+    """
+    Build the verdict cache for `llm`, or return None when caching does not apply
+    (no LLM, disabled via --no-cache, or a sampling temperature that makes verdicts non-deterministic).
+    """
+    if llm is None or not enabled:
+        return None
+    temperature = getattr(llm, "temperature", None)
+    if temperature != 0:
+        print(f"Judge cache disabled: temperature={temperature} is not deterministic (set temperature=0 to enable).")
+        return None
+    return JudgeCache(
+        FileBackend(DEFAULT_CACHE_DIR, ttl),
+        model_provider=str(getattr(llm, "model_provider", "")),
+        model_version=str(getattr(llm, "model_version", "")),
+        temperature=temperature,
+    )
@@ -0,0 +1,35 @@
+"""
+Per-run cache for validated Pydantic models loaded from data files.
+
+`load_cached(path, cls, parse, memo)` returns the models parsed from `path`. Files whose
+bytes were already parsed into `cls` during this run (e.g. the same benchmark copied
+into several directories) reuse those instances instead of re-running validation.
+
+The memo is a plain dict owned by the caller (one per review run) and keyed on the
+sha256 digest of the file, so file contents are not kept alive alongside the models.
+
+There is deliberately no on-disk layer: unpickling Pydantic models costs about as
+much as validating them again, so a disk cache would not pay for its I/O.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+ModelMemo = Dict[Tuple[type, bytes], list]
+
+
+def load_cached(path: Path, cls: Type[M], parse: Callable[[bytes], List[M]], memo: Optional[ModelMemo]) -> List[M]:
+    data = Path(path).read_bytes()
+    if memo is None:
+        return parse(data)
+    key = (cls, hashlib.sha256(data).digest())
+    models = memo.get(key)
+    if models is None:
+        models = memo[key] = parse(data)
+    # Hand out a fresh list so callers cannot reorder/extend the cached one.
+    return list(models)
@@ -19,16 +19,26 @@ import json
 import re
 from dataclasses import asdict, dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
 
 from pydantic import BaseModel, Field, field_validator
 
 from model import ClozeTest, ReadingTask
-from utils import LLMService
+from services.json_io import dump_json
+
+if TYPE_CHECKING:  # only for annotations; utils pulls in the LLM SDKs
+    from utils import LLMService
 
 Severity = Literal["fatal", "warning", "info"]
 
+_WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+_PLACEHOLDER_RE = re.compile(r"<question_(\d+)>")
+_ALPHA_RE = re.compile(r"[A-Za-z]")
+_LIST_SPLIT_RE = re.compile(r"(?:\r?\n)+|;+")
+_LIST_NUMBERING_RE = re.compile(r"^\s*\d+\s*[\.\)、\-:：]\s*")
+
 
 @dataclass(frozen=True)
 class Issue:
@@ -43,9 +53,23 @@ def _add(issues: List[Issue], severity: Severity, code: str, message: str, locat
     issues.append(Issue(severity=severity, code=code, message=message, location=location))
 
 
+def _severity_counts(issues: List[Issue]) -> Tuple[int, int, int]:
+    # (fatal, warning, info) in a single pass over the issues.
+    fatal = warning = info = 0
+    for x in issues:
+        sev = x.severity
+        if sev == "fatal":
+            fatal += 1
+        elif sev == "warning":
+            warning += 1
+        elif sev == "info":
+            info += 1
+    return fatal, warning, info
+
+
 def _tokenize_words(text: str) -> List[str]:
     # English word tokenizer used for rough length/quality heuristics.
-    return re.findall(r"[A-Za-z]+(?:'[A-Za-z]+)?", text or "")
+    return _WORD_RE.findall(text or "")
 
 
 def _is_mostly_english(text: str, min_alpha_ratio: float = 0.6) -> bool:
@@ -58,10 +82,15 @@ def _is_mostly_english(text: str, min_alpha_ratio: float = 0.6) -> bool:
     return (ascii_letters / denom) >= min_alpha_ratio
 
 
+@lru_cache(maxsize=4096)
+def _extract_qnums(text: str) -> Tuple[int, ...]:
+    return tuple(int(m.group(1)) for m in _PLACEHOLDER_RE.finditer(text))
+
+
 def _detect_placeholders(text: str) -> List[int]:
     # Extract <question_i> indices from cloze content.
-    # Returns list of integers (may have duplicates).
-    return [int(m.group(1)) for m in re.finditer(r"<question_(\d+)>", text or "")]
+    # Returns list of integers (may have duplicates); memoized per content string.
+    return list(_extract_qnums(text or ""))
 
 
 def _has_duplicate_options(options: Dict[str, str]) -> bool:
@@ -130,7 +159,7 @@ def rule_check_cloze(item: ClozeTest) -> Tuple[List[Issue], Dict[str, Any]]:
             vv = (v or "").strip()
             if len(vv) <= 1:
                 _add(issues, "warning", "CLOZE_OPTION_TOO_SHORT", f"Option {k} is too short: '{vv}'.", location=f"blank[{i}].options.{k}")
-            if not re.search(r"[A-Za-z]", vv):
+            if not _ALPHA_RE.search(vv):
                 _add(issues, "warning", "CLOZE_OPTION_NO_ALPHA", f"Option {k} contains no letters: '{vv}'.", location=f"blank[{i}].options.{k}")
 
     # Answer validity + "answer text duplication" heuristic.
@@ -149,9 +178,7 @@ def rule_check_cloze(item: ClozeTest) -> Tuple[List[Issue], Dict[str, Any]]:
     if len(_tokenize_words(item.content)) < 120:
         _add(issues, "info", "CLOZE_CONTENT_SHORT", "Cloze passage seems short; consider exam-level length.", location="content")
 
-    stats["fatal_count"] = sum(1 for x in issues if x.severity == "fatal")
-    stats["warning_count"] = sum(1 for x in issues if x.severity == "warning")
-    stats["info_count"] = sum(1 for x in issues if x.severity == "info")
+    stats["fatal_count"], stats["warning_count"], stats["info_count"] = _severity_counts(issues)
     return issues, stats
 
 
@@ -207,9 +234,7 @@ def rule_check_reading(task: ReadingTask) -> Tuple[List[Issue], Dict[str, Any]]:
         if len(_tokenize_words(q.prompt)) < 5:
             _add(issues, "warning", "READING_PROMPT_TOO_SHORT", "Question prompt seems too short/underspecified.", location=f"q[{q.id}].prompt")
 
-    stats["fatal_count"] = sum(1 for x in issues if x.severity == "fatal")
-    stats["warning_count"] = sum(1 for x in issues if x.severity == "warning")
-    stats["info_count"] = sum(1 for x in issues if x.severity == "info")
+    stats["fatal_count"], stats["warning_count"], stats["info_count"] = _severity_counts(issues)
     return issues, stats
 
 
@@ -254,10 +279,10 @@ class ClozeLLMJudgement(BaseModel):
             text = v.strip()
             if not text:
                 return []
-            parts = re.split(r"(?:\r?\n)+|;+", text)
+            parts = _LIST_SPLIT_RE.split(text)
             cleaned: List[str] = []
             for p in parts:
-                p = re.sub(r"^\s*\d+\s*[\.\)、\-:：]\s*", "", p.strip())
+                p = _LIST_NUMBERING_RE.sub("", p.strip())
                 if p:
                     cleaned.append(p)
             return cleaned
@@ -303,10 +328,10 @@ class ReadingLLMJudgement(BaseModel):
             text = v.strip()
             if not text:
                 return []
-            parts = re.split(r"(?:\r?\n)+|;+", text)
+            parts = _LIST_SPLIT_RE.split(text)
             cleaned: List[str] = []
             for p in parts:
-                p = re.sub(r"^\s*\d+\s*[\.\)、\-:：]\s*", "", p.strip()) # Remove leading numbering or bullet points
+                p = _LIST_NUMBERING_RE.sub("", p.strip()) # Remove leading numbering or bullet points
                 if p:
                     cleaned.append(p)
             return cleaned
@@ -455,74 +480,212 @@ def _normalize_reading_judgement(task: ReadingTask, judge: ReadingLLMJudgement)
     )
 
 
-def llm_judge_cloze(item: ClozeTest, llm: LLMService) -> ClozeLLMJudgement:
-    system = (
-        "You are an expert English exam item reviewer for Chinese postgraduate entrance exams (考研英语). "
-        "Judge whether a cloze passage and its options/answers are high-quality, unambiguous, and appropriately difficult."
-    )
-    user = {
-        "task": "review_cloze_quality",
+_CLOZE_SYSTEM = (
+    "You are an expert English exam item reviewer for Chinese postgraduate entrance exams (考研英语). "
+    "Judge whether a cloze passage and its options/answers are high-quality, unambiguous, and appropriately difficult."
+)
+_CLOZE_OUTPUT_REQUIREMENTS = {
+    "predicted_answers": "Choose A/B/C/D for EACH blank independently, based on best fit.",
+    "confidence": "List floats in [0,1] for each blank.",
+    "answer_mismatch_indices": "0-based indices where your predicted answer differs from provided_answers.",
+    "overall_scores": "0-10 integers with keys: option_setting, question_quality, difficulty, language, coherence.",
+    "overall_score": "A float in [0,100]. Prefer computing it consistently from overall_scores.",
+    "per_blank": "List per blank with: index, predicted, confidence, matches_provided, scores(0-10 keys: option_quality, blank_quality, difficulty, clarity), notes.",
+    "fatal_issues": "List of fatal problems (if any).",
+    "improvements": "Actionable improvements.",
+}
+_CLOZE_CONSTRAINTS = [
+    "Return ONLY the structured output; no extra keys.",
+    "If multiple answers could fit, mark validity low and list it in fatal_issues.",
+]
+
+_READING_SYSTEM = (
+    "You are an expert English exam item reviewer for Chinese postgraduate entrance exams (考研英语). "
+    "Judge whether a reading passage and its multiple-choice questions are high-quality, grounded in the passage, "
+    "unambiguous, and appropriately difficult."
+)
+_READING_OUTPUT_REQUIREMENTS = {
+    "predicted_answers": "Dict mapping question id -> A/B/C/D.",
+    "confidence": "Dict mapping question id -> float in [0,1].",
+    "answer_mismatch_ids": "List question ids where your predicted answer differs from provided_answer.",
+    "overall_scores": "0-10 integers with keys: option_setting, question_quality, grounding, difficulty, language.",
+    "overall_score": "A float in [0,100]. Prefer computing it consistently from overall_scores.",
+    "per_question": "List per question with: id, predicted, confidence, matches_provided, scores(0-10 keys: option_quality, question_quality, grounding, difficulty, clarity), notes.",
+    "fatal_issues": "List of fatal problems (if any).",
+    "improvements": "Actionable improvements.",
+}
+_READING_CONSTRAINTS = [
+    "Answer ONLY based on the passage; if not supported, mark grounding low and mention in fatal_issues.",
+    "Return ONLY the structured output; no extra keys.",
+]
+
+
+def _cloze_payload(item: ClozeTest) -> Dict[str, Any]:
+    return {
         "passage": item.content,
         "options": [o.model_dump() for o in item.options],
         "provided_answers": item.answers,
-        "output_requirements": {
-            "predicted_answers": "Choose A/B/C/D for EACH blank independently, based on best fit.",
-            "confidence": "List floats in [0,1] for each blank.",
-            "answer_mismatch_indices": "0-based indices where your predicted answer differs from provided_answers.",
-            "overall_scores": "0-10 integers with keys: option_setting, question_quality, difficulty, language, coherence.",
-            "overall_score": "A float in [0,100]. Prefer computing it consistently from overall_scores.",
-            "per_blank": "List per blank with: index, predicted, confidence, matches_provided, scores(0-10 keys: option_quality, blank_quality, difficulty, clarity), notes.",
-            "fatal_issues": "List of fatal problems (if any).",
-            "improvements": "Actionable improvements.",
-        },
-        "constraints": [
-            "Return ONLY the structured output; no extra keys.",
-            "If multiple answers could fit, mark validity low and list it in fatal_issues.",
-        ],
     }
-    judge = llm.invoke(user_prompt=json.dumps(user, ensure_ascii=False), system_prompt=system, pydantic_obj=ClozeLLMJudgement)
-    return _normalize_cloze_judgement(item, judge)
 
 
-def llm_judge_reading(task: ReadingTask, llm: LLMService) -> ReadingLLMJudgement:
-    system = (
-        "You are an expert English exam item reviewer for Chinese postgraduate entrance exams (考研英语). "
-        "Judge whether a reading passage and its multiple-choice questions are high-quality, grounded in the passage, "
-        "unambiguous, and appropriately difficult."
-    )
-    user = {
-        "task": "review_reading_quality",
+def _reading_payload(task: ReadingTask) -> Dict[str, Any]:
+    return {
         "title": task.title,
         "passage": task.content,
         "questions": [
             {"id": q.id, "prompt": q.prompt, "options": q.options.model_dump(), "provided_answer": q.answer}
             for q in task.questions
         ],
-        "output_requirements": {
-            "predicted_answers": "Dict mapping question id -> A/B/C/D.",
-            "confidence": "Dict mapping question id -> float in [0,1].",
-            "answer_mismatch_ids": "List question ids where your predicted answer differs from provided_answer.",
-            "overall_scores": "0-10 integers with keys: option_setting, question_quality, grounding, difficulty, language.",
-            "overall_score": "A float in [0,100]. Prefer computing it consistently from overall_scores.",
-            "per_question": "List per question with: id, predicted, confidence, matches_provided, scores(0-10 keys: option_quality, question_quality, grounding, difficulty, clarity), notes.",
-            "fatal_issues": "List of fatal problems (if any).",
-            "improvements": "Actionable improvements.",
-        },
-        "constraints": [
-            "Answer ONLY based on the passage; if not supported, mark grounding low and mention in fatal_issues.",
-            "Return ONLY the structured output; no extra keys.",
-        ],
     }
-    judge = llm.invoke(user_prompt=json.dumps(user, ensure_ascii=False), system_prompt=system, pydantic_obj=ReadingLLMJudgement)
+
+
+# Prompt layout is static-first: system text, then the fixed task/requirements/constraints,
+# then the item itself (passage before questions). Providers with automatic prefix caching
+# (OpenAI, DeepSeek) can then reuse the shared prefix across calls, and repeated judging of
+# the same passage only pays full price for the trailing question block.
+#
+# The fixed part is serialized once at import; per call only the item payload is dumped
+# and appended, giving the same text as json.dumps() of the whole dict.
+
+
+def _json_head(static: Dict[str, Any]) -> str:
+    # json.dumps(static) without its closing brace, ready for more keys.
+    return json.dumps(static, ensure_ascii=False)[:-1]
+
+
+def _json_join(head: str, tail: Dict[str, Any]) -> str:
+    # Same text as json.dumps({**static, **tail}, ensure_ascii=False) for disjoint keys.
+    if not tail:
+        return head + "}"
+    return f"{head}, {json.dumps(tail, ensure_ascii=False)[1:]}"
+
+
+_BATCH_JUDGEMENTS_REQUIREMENT = "List with one judgement per entry of `items`, in the same order; each has the keys below."
+_BATCH_CONSTRAINT = "Judge each item independently; do not compare items."
+
+_CLOZE_PROMPT_HEAD = _json_head(
+    {
+        "task": "review_cloze_quality",
+        "output_requirements": _CLOZE_OUTPUT_REQUIREMENTS,
+        "constraints": _CLOZE_CONSTRAINTS,
+    }
+)
+_READING_PROMPT_HEAD = _json_head(
+    {
+        "task": "review_reading_quality",
+        "output_requirements": _READING_OUTPUT_REQUIREMENTS,
+        "constraints": _READING_CONSTRAINTS,
+    }
+)
+_CLOZE_BATCH_PROMPT_HEAD = _json_head(
+    {
+        "task": "review_cloze_quality_batch",
+        "output_requirements": {"judgements": _BATCH_JUDGEMENTS_REQUIREMENT, **_CLOZE_OUTPUT_REQUIREMENTS},
+        "constraints": _CLOZE_CONSTRAINTS + [_BATCH_CONSTRAINT],
+    }
+)
+_READING_BATCH_PROMPT_HEAD = _json_head(
+    {
+        "task": "review_reading_quality_batch",
+        "output_requirements": {"judgements": _BATCH_JUDGEMENTS_REQUIREMENT, **_READING_OUTPUT_REQUIREMENTS},
+        "constraints": _READING_CONSTRAINTS + [_BATCH_CONSTRAINT],
+    }
+)
+
+
+def cloze_judge_prompts(item: ClozeTest) -> Tuple[str, str]:
+    # (system, user) prompts for judging one cloze item.
+    return _CLOZE_SYSTEM, _json_join(_CLOZE_PROMPT_HEAD, _cloze_payload(item))
+
+
+def reading_judge_prompts(task: ReadingTask) -> Tuple[str, str]:
+    # (system, user) prompts for judging one reading task.
+    return _READING_SYSTEM, _json_join(_READING_PROMPT_HEAD, _reading_payload(task))
+
+
+def _cloze_batch_judge_prompts(items: List[ClozeTest]) -> Tuple[str, str]:
+    # (system, user) prompts for judging several cloze items in one call.
+    tail = {
+        "items": [{"item_index": k, **_cloze_payload(it)} for k, it in enumerate(items)],
+        "expected_judgements": len(items),
+    }
+    return _CLOZE_SYSTEM, _json_join(_CLOZE_BATCH_PROMPT_HEAD, tail)
+
+
+def _reading_batch_judge_prompts(tasks: List[ReadingTask]) -> Tuple[str, str]:
+    # (system, user) prompts for judging several reading tasks in one call.
+    tail = {
+        "items": [{"item_index": k, **_reading_payload(t)} for k, t in enumerate(tasks)],
+        "expected_judgements": len(tasks),
+    }
+    return _READING_SYSTEM, _json_join(_READING_BATCH_PROMPT_HEAD, tail)
+
+
+class ClozeLLMJudgementBatch(BaseModel):
+    judgements: List[ClozeLLMJudgement] = Field(description="One judgement per input item, in input order.")
+
+
+class ReadingLLMJudgementBatch(BaseModel):
+    judgements: List[ReadingLLMJudgement] = Field(description="One judgement per input item, in input order.")
+
+
+def llm_judge_cloze(item: ClozeTest, llm: "LLMService") -> ClozeLLMJudgement:
+    system, user = cloze_judge_prompts(item)
+    judge = llm.invoke(user_prompt=user, system_prompt=system, pydantic_obj=ClozeLLMJudgement)
+    return _normalize_cloze_judgement(item, judge)
+
+
+def llm_judge_reading(task: ReadingTask, llm: "LLMService") -> ReadingLLMJudgement:
+    system, user = reading_judge_prompts(task)
+    judge = llm.invoke(user_prompt=user, system_prompt=system, pydantic_obj=ReadingLLMJudgement)
     return _normalize_reading_judgement(task, judge)
 
 
+async def llm_judge_cloze_async(item: ClozeTest, llm: "LLMService") -> ClozeLLMJudgement:
+    system, user = cloze_judge_prompts(item)
+    judge = await llm.ainvoke(user_prompt=user, system_prompt=system, pydantic_obj=ClozeLLMJudgement)
+    return _normalize_cloze_judgement(item, judge)
+
+
+async def llm_judge_reading_async(task: ReadingTask, llm: "LLMService") -> ReadingLLMJudgement:
+    system, user = reading_judge_prompts(task)
+    judge = await llm.ainvoke(user_prompt=user, system_prompt=system, pydantic_obj=ReadingLLMJudgement)
+    return _normalize_reading_judgement(task, judge)
+
+
+async def llm_judge_cloze_batch_async(items: List[ClozeTest], llm: "LLMService") -> List[ClozeLLMJudgement]:
+    """
+    Judge several cloze items with a single LLM call.
+
+    Raises ValueError when the model returns the wrong number of judgements, so
+    callers can fall back to judging the items one by one.
+    """
+    system, user = _cloze_batch_judge_prompts(items)
+    batch = await llm.ainvoke(user_prompt=user, system_prompt=system, pydantic_obj=ClozeLLMJudgementBatch)
+    if len(batch.judgements) != len(items):
+        raise ValueError(f"Expected {len(items)} cloze judgements, got {len(batch.judgements)}.")
+    return [_normalize_cloze_judgement(it, j) for it, j in zip(items, batch.judgements)]
+
+
+async def llm_judge_reading_batch_async(tasks: List[ReadingTask], llm: "LLMService") -> List[ReadingLLMJudgement]:
+    """
+    Judge several reading tasks with a single LLM call.
+
+    Raises ValueError when the model returns the wrong number of judgements, so
+    callers can fall back to judging the tasks one by one.
+    """
+    system, user = _reading_batch_judge_prompts(tasks)
+    batch = await llm.ainvoke(user_prompt=user, system_prompt=system, pydantic_obj=ReadingLLMJudgementBatch)
+    if len(batch.judgements) != len(tasks):
+        raise ValueError(f"Expected {len(tasks)} reading judgements, got {len(batch.judgements)}.")
+    return [_normalize_reading_judgement(t, j) for t, j in zip(tasks, batch.judgements)]
+
+
 def overall_score(rule_issues: List[Issue], llm_overall_score: Optional[float] = None) -> float:
-    if any(x.severity == "fatal" for x in rule_issues):
+    fatal, warning, info = _severity_counts(rule_issues)
+    if fatal:
         return 0.0
-    base = 85.0
-    base -= 8.0 * sum(1 for x in rule_issues if x.severity == "warning")
-    base -= 2.0 * sum(1 for x in rule_issues if x.severity == "info")
+    base = 85.0 - 8.0 * warning - 2.0 * info
     base = max(0.0, min(100.0, base))
 
     if llm_overall_score is not None:
@@ -534,7 +697,7 @@ def overall_score(rule_issues: List[Issue], llm_overall_score: Optional[float] =
 def dump_report_json(path: Union[str, Path], report: Dict[str, Any]) -> None:
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_bytes(dump_json(report))
 
 
 def now_tag() -> str:
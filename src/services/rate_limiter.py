@@ -0,0 +1,79 @@
+"""
+Client-side throttling for concurrent LLM judge calls.
+
+`AsyncRateLimiter` combines two limits:
+- a semaphore capping how many calls are in flight at once;
+- a minimum spacing of 60/rpm seconds between call starts, so bursts from
+  `asyncio.gather` stay under the provider's requests-per-minute quota.
+
+Usage:
+    limiter = AsyncRateLimiter(max_concurrency=8, rpm=200)
+    async with limiter:
+        await llm.ainvoke(...)
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class AsyncRateLimiter:
+    def __init__(self, max_concurrency: int, rpm: Optional[float] = None):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm if rpm and rpm > 0 else None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._interval = 60.0 / self.rpm if self.rpm else 0.0
+        self._next_start = 0.0
+
+    def _reserve_start(self) -> float:
+        # Reserve the next free start slot; returns how long the caller must wait for it.
+        # No await between read and write, so this is atomic within the event loop.
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        return start - now
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self._semaphore.acquire()
+        if self._interval:
+            try:
+                wait = self._reserve_start()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._semaphore.release()
+
+
+# Providers that front other vendors' models (e.g. DeepSeek via an OpenAI-compatible endpoint),
+# so the model family decides the quota. Others (ollama, bedrock, ...) impose their own.
+_FAMILY_ROUTED_PROVIDERS = ("openai", "azure_openai")
+
+
+def default_rpm(config: object) -> Optional[int]:
+    """
+    Look up the RPM budget for the configured judge model in `config.provider_rpm`.
+
+    For OpenAI-compatible providers the model family (e.g. "deepseek" from "deepseek-chat")
+    wins, since such endpoints are often reached via `model_provider="openai"`; otherwise
+    the provider's own entry applies, so a local ollama model stays unlimited.
+
+    >>> from types import SimpleNamespace as NS
+    >>> table = {"openai": 500, "deepseek": 200, "ollama": 0}
+    >>> default_rpm(NS(provider_rpm=table, model_provider="openai", model_version="deepseek-chat"))
+    200
+    >>> default_rpm(NS(provider_rpm=table, model_provider="ollama", model_version="deepseek-r1:32b-qwen-distill-fp16"))
+    0
+    """
+    table = getattr(config, "provider_rpm", None) or {}
+    family = str(getattr(config, "model_version", "") or "").split("-", 1)[0].lower()
+    provider = str(getattr(config, "model_provider", "") or "").lower()
+    if provider in _FAMILY_ROUTED_PROVIDERS and family in table:
+        return table[family]
+    return table.get(provider)
@@ -1,43 +1,209 @@
 # utils.py
 from optparse import Option
+import asyncio
+from email.utils import parsedate_to_datetime
+import mmap
+from contextvars import ContextVar
+from functools import cached_property, lru_cache
 import re
 import subprocess
 import os
 from token import OP
-from typing import Optional, Any, Type, TypedDict, List
+from typing import Optional, Any, Callable, Type, TypedDict, List
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from langchain.chat_models import init_chat_model
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.runnables import RunnableLambda
 from pathlib import Path
 from model import ClozeTest, ReadingTask
+from services.json_io import json_loads
 from sklearn import base
 import requests
 import time
 import random
 import shutil
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
+import httpx
+import openai
+import tiktoken
 import json
 
 class ResponseWithThinkPydantic(BaseModel):
     think: str = Field(description="Thought process of the LLM")
     response: str = Field(description="Response of the LLM")
 
+# Structural tokens for `_find_first_json_block`: a whole JSON string (so brackets inside
+# it are skipped) or a single bracket.
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+_JSON_OPEN_RE = re.compile(r"[\[{]")
+
+
+def _find_first_json_block(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} or [...] block in `text`, or None.
+
+    Linear scan with a depth counter; unlike a greedy `{.*}` regex it stops at the
+    block's own closing bracket, so trailing prose with braces cannot leak in.
+    """
+    m = _JSON_OPEN_RE.search(text)
+    if not m:
+        return None
+    start = m.start()
+    depth = 0
+    for tok in _JSON_TOKEN_RE.finditer(text, start):
+        ch = tok.group()
+        if ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:tok.end()]
+    return None
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _extract_json_object(text: str) -> str:
     text = (text or "").strip()
     if not text:
         return text
+    # One raw_decode from the start: a whole-text JSON value is returned as is, and a
+    # leading {...}/[...] followed by prose is cut at its end without a second parse.
     try:
-        json.loads(text)
-        return text
-    except Exception:
+        _, end = _JSON_DECODER.raw_decode(text)
+        if end == len(text):
+            return text
+        if text[0] in "{[":
+            return text[:end]
+    except ValueError:
         pass
 
-    # Try to extract the first {...} or [...] block.
-    m = re.search(r"(\{[\s\S]*\}|\[[\s\S]*\])", text)
+    # Otherwise decode from the first {...} or [...] block.
+    m = _JSON_OPEN_RE.search(text)
     if m:
-        return m.group(1).strip()
+        try:
+            _, end = _JSON_DECODER.raw_decode(text, m.start())
+            return text[m.start():end]
+        except ValueError:
+            pass
+    # Not valid JSON there either: hand back the balanced block so the caller's parse reports why.
+    block = _find_first_json_block(text)
+    if block is not None:
+        return block.strip()
     return text
 
+# Providers served through LangChain's OpenAI client classes (httpx transport, tiktoken token counts).
+_OPENAI_COMPATIBLE_PROVIDERS = ("openai", "azure_openai", "deepseek")
+
+
+@lru_cache(maxsize=None)
+def _tiktoken_encoding(model: str) -> tiktoken.Encoding:
+    # Same model -> encoding resolution as langchain_openai, but done once per model
+    # instead of on every get_num_tokens call.
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoder = "o200k_base" if model.lower().startswith(("gpt-4o", "gpt-4.1", "gpt-5")) else "cl100k_base"
+        return tiktoken.get_encoding(encoder)
+
+
+@lru_cache(maxsize=None)
+def _fallback_system(pydantic_obj: Type[BaseModel]) -> str:
+    # Fixed per schema class, so built once and byte-identical on every call (keeps provider prompt caches warm).
+    field_names = list(getattr(pydantic_obj, "model_fields", {}).keys())
+    return (
+        "Return ONLY a valid JSON value (no Markdown, no code fences). "
+        f"Top-level keys MUST be: {field_names}."
+    )
+
+
+# Errors that may signal rate limiting; `_is_throttling` decides per instance.
+_RATE_LIMIT_ERRORS = (ClientError, openai.RateLimitError, httpx.HTTPStatusError)
+
+
+def _is_throttling(e: BaseException) -> bool:
+    if isinstance(e, ClientError):
+        return e.response['Error']['Code'] in ('Throttling', 'TooManyRequestsException')
+    if isinstance(e, openai.RateLimitError):
+        return True
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429
+
+
+def _retry_after(e: BaseException) -> Optional[float]:
+    # Server-requested wait in seconds (Retry-After-Ms / Retry-After headers), if the error carries one.
+    response = getattr(e, "response", None)
+    if isinstance(response, dict):  # botocore ClientError
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    else:
+        headers = getattr(response, "headers", None) or {}
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return float(retry_after_ms) / 1000
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:  # HTTP-date form
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(retry_count: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    # Exponential backoff with up to 10% jitter.
+    delay = min(max_delay, base_delay * (2 ** (retry_count - 1)))
+    return delay + random.uniform(0, 0.1 * delay)
+
+
+def _throttle_delay(e: BaseException, retry_count: int) -> float:
+    # Never retry sooner than the provider asked for.
+    return max(_backoff_delay(retry_count), _retry_after(e) or 0.0)
+
+
+# Set per call by `LLMService.invoke`/`ainvoke`; `_CountingCache` appends to it on a hit.
+# Runnables run in a copy of the context, but the list object itself is shared.
+_CACHE_HIT: ContextVar[Optional[list]] = ContextVar("_CACHE_HIT", default=None)
+
+
+class _CountingCache(BaseCache):
+    """LangChain cache wrapper that counts hits and flags them on the current call."""
+
+    def __init__(self, inner: BaseCache):
+        self.inner = inner
+        self.hits = 0
+
+    def _seen(self, value: Any) -> Any:
+        if value is not None:
+            self.hits += 1
+            flag = _CACHE_HIT.get()
+            if flag is not None:
+                flag.append(True)
+        return value
+
+    def lookup(self, prompt: str, llm_string: str) -> Any:
+        return self._seen(self.inner.lookup(prompt, llm_string))
+
+    async def alookup(self, prompt: str, llm_string: str) -> Any:
+        return self._seen(await self.inner.alookup(prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val: Any) -> None:
+        self.inner.update(prompt, llm_string, return_val)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Any) -> None:
+        await self.inner.aupdate(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.inner.clear(**kwargs)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await self.inner.aclear(**kwargs)
+
+
 class LLMService:
     def __init__(self, config: object):
         self.model_version = getattr(config, "model_version", "gpt-4o")
@@ -52,16 +218,183 @@ class LLMService:
         self.failed_calls = 0
         self.retry_count = 0
         self.thinking = getattr(config, "thinking", False)
+        self.track_tokens = getattr(config, "track_tokens", True)
+        # time.monotonic() before which no new request is sent, set when a call gets throttled
+        self._cooldown_until = 0.0
+        self._structured_cache: dict = {}
+        self.llm_cache = self._make_llm_cache(config)
         # Initialize the LLM
         try:
             self.llm = init_chat_model(
                 self.model_version, 
                 model_provider=self.model_provider, 
                 temperature=self.temperature,
+                cache=self.llm_cache,
+                **self._client_kwargs(config),
             )
         except Exception as e:
             raise Exception(f"Failed to initialize LLM: {str(e)}")
     
+    @property
+    def cache_hits(self) -> int:
+        return self.llm_cache.hits if self.llm_cache else 0
+
+    def _make_llm_cache(self, config: object) -> Optional[_CountingCache]:
+        # Only deterministic calls are cached: at temperature > 0 a repeated prompt should sample again.
+        if self.temperature != 0 or not getattr(config, "llm_cache", True):
+            return None
+        cache_path = getattr(config, "llm_cache_path", "")
+        if cache_path:
+            try:
+                from langchain_community.cache import SQLiteCache
+                return _CountingCache(SQLiteCache(database_path=str(cache_path)))
+            except ImportError:
+                print("langchain_community is not installed; falling back to an in-memory LLM cache.")
+        return _CountingCache(InMemoryCache())
+
+    def _client_kwargs(self, config: object) -> dict:
+        """
+        HTTP clients with a keep-alive pool, so repeated calls reuse connections instead
+        of paying a TCP+TLS handshake each time. Created once per LLMService: build the
+        service inside each worker process rather than sharing one across a fork.
+        """
+        max_connections = getattr(config, "http_max_connections", 1000)
+        if self.model_provider in _OPENAI_COMPATIBLE_PROVIDERS:
+            # The SDK's default clients, so only the pool limits differ from its own settings
+            # (timeouts, redirects, ...).
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=getattr(config, "http_max_keepalive", 100),
+            )
+            return {
+                "http_client": openai.DefaultHttpxClient(limits=limits),
+                "http_async_client": openai.DefaultAsyncHttpxClient(limits=limits),
+            }
+        if self.model_provider in ("bedrock", "bedrock_converse"):
+            # Few botocore-level attempts: throttling is mainly retried by `_handle_throttle`.
+            return {
+                "config": BotoConfig(
+                    max_pool_connections=max_connections,
+                    retries={"mode": "adaptive", "total_max_attempts": 3},
+                )
+            }
+        return {}
+
+    def _build_messages(self, user_prompt: str, system_prompt: Optional[str]) -> List[dict]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": user_prompt})
+        return messages
+
+    @cached_property
+    def _num_tokens(self) -> Callable[[str], int]:
+        # OpenAI-compatible models are counted with tiktoken either way; bind the encoder once
+        # (lazily: loading it may fetch the BPE file). Other providers keep the chat model's own counter.
+        if self.model_provider in _OPENAI_COMPATIBLE_PROVIDERS:
+            encode = _tiktoken_encoding(self.model_version).encode
+            return lambda text: len(encode(text))
+        return self.llm.get_num_tokens
+
+    def _count_prompt_tokens(self, messages: List[dict]) -> int:
+        num_tokens = self._num_tokens
+        return sum(num_tokens(message["content"]) for message in messages)
+
+    def _record_usage(self, messages: List[dict], response: Any) -> None:
+        if not self.track_tokens:
+            return
+        prompt_tokens = self._count_prompt_tokens(messages)
+        # Calculate completion tokens
+        response_content = str(response)
+        completion_tokens = self._num_tokens(response_content)
+        total_tokens = prompt_tokens + completion_tokens
+
+        # Update statistics
+        self.total_prompt_tokens += prompt_tokens
+        self.total_completion_tokens += completion_tokens
+        self.total_tokens += total_tokens
+
+    @staticmethod
+    def _fallback_messages(messages: List[dict], pydantic_obj: Type[BaseModel]) -> List[dict]:
+        # Some providers/models reject certain `response_format` / schema modes.
+        # Fallback: ask for strict JSON and validate with Pydantic locally.
+        # The caller's (static) system prompt stays first so the fallback request shares its
+        # cacheable prefix; the JSON instruction follows it, before the per-call user prompt.
+        fallback = {"role": "system", "content": _fallback_system(pydantic_obj)}
+        if messages and messages[0]["role"] == "system":
+            return [messages[0], fallback, *messages[1:]]
+        return [fallback, *messages]
+
+    @staticmethod
+    def _parse_fallback(raw: Any, pydantic_obj: Type[BaseModel]) -> BaseModel:
+        raw_text = raw.content if hasattr(raw, "content") else str(raw)
+        raw_text = _extract_json_object(raw_text)
+        parsed = json_loads(raw_text)
+        return pydantic_obj.model_validate(parsed)
+
+    def _structured_llm(self, pydantic_obj: Type[BaseModel]) -> Any:
+        # Binding a schema re-derives its JSON schema / tool spec; do it once per class.
+        structured_llm = self._structured_cache.get(pydantic_obj)
+        if structured_llm is None:
+            structured_llm = self._structured_cache[pydantic_obj] = self.llm.with_structured_output(pydantic_obj)
+        return structured_llm
+
+    def _start_cooldown(self, delay: float) -> None:
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+
+    def _cooldown_remaining(self) -> float:
+        # After one call is throttled, other calls on this service hold off too
+        # instead of hitting the provider while it is still limiting us.
+        return max(0.0, self._cooldown_until - time.monotonic())
+
+    def _handle_throttle(self, e: Exception, retry_count: int, max_retries: int) -> float:
+        # Shared retry policy for `invoke`/`ainvoke`: returns how long to back off before
+        # attempt `retry_count`, or re-raises when the error is not throttling / retries are spent.
+        if not _is_throttling(e):
+            self.failed_calls += 1
+            raise e
+        self.retry_count += 1
+        if retry_count > max_retries:
+            self.failed_calls += 1
+            raise Exception(f"Maximum retries ({max_retries}) exceeded: {str(e)}")
+        sleep_time = _throttle_delay(e, retry_count)
+        self._start_cooldown(sleep_time)
+        print(f"ThrottlingException occurred: {str(e)}. Retrying in {sleep_time:.2f} seconds (attempt {retry_count}/{max_retries})")
+        return sleep_time
+
+    def _call_once(self, messages: List[dict], pydantic_obj: Optional[Type[BaseModel]]) -> Any:
+        # One provider round trip (plus the JSON fallback for structured output); no retries.
+        if pydantic_obj:
+            try:
+                structured_llm = self._structured_llm(pydantic_obj)
+                return structured_llm.invoke(messages)
+            except Exception as e:
+                if _is_throttling(e):
+                    raise
+                raw = self.llm.invoke(self._fallback_messages(messages, pydantic_obj))
+                return self._parse_fallback(raw, pydantic_obj)
+        if self.model_version.startswith("deepseek"):
+            structured_llm = self._structured_llm(ResponseWithThinkPydantic)
+            # Extract the resposne without the think
+            return structured_llm.invoke(messages).response
+        return self.llm.invoke(messages).content
+
+    async def _acall_once(self, messages: List[dict], pydantic_obj: Optional[Type[BaseModel]]) -> Any:
+        # Async mirror of `_call_once`; keep the two in step.
+        if pydantic_obj:
+            try:
+                structured_llm = self._structured_llm(pydantic_obj)
+                return await structured_llm.ainvoke(messages)
+            except Exception as e:
+                if _is_throttling(e):
+                    raise
+                raw = await self.llm.ainvoke(self._fallback_messages(messages, pydantic_obj))
+                return self._parse_fallback(raw, pydantic_obj)
+        if self.model_version.startswith("deepseek"):
+            structured_llm = self._structured_llm(ResponseWithThinkPydantic)
+            return (await structured_llm.ainvoke(messages)).response
+        return (await self.llm.ainvoke(messages)).content
+
     def invoke(self, 
               user_prompt: str, 
               system_prompt: Optional[str] = None, 
@@ -80,86 +413,159 @@ class LLMService:
             The LLM response with token usage statistics
         """
         self.total_calls += 1
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": user_prompt})
-        
-        # Calculate prompt tokens
-        prompt_tokens = 0
-        for message in messages:
-            prompt_tokens += self.llm.get_num_tokens(message["content"])
+        messages = self._build_messages(user_prompt, system_prompt)
+        cache_hit: list = []
+        _CACHE_HIT.set(cache_hit)
         
         retry_count = 0
         while True:
+            wait = self._cooldown_remaining()
+            if wait:
+                time.sleep(wait)
             try:
-                if pydantic_obj:
-                    try:
-                        structured_llm = self.llm.with_structured_output(pydantic_obj)
-                        response = structured_llm.invoke(messages)
-                    except Exception as e:
-                        # Some providers/models reject certain `response_format` / schema modes.
-                        # Fallback: ask for strict JSON and validate with Pydantic locally.
-                        field_names = list(getattr(pydantic_obj, "model_fields", {}).keys())
-                        fallback_system = (
-                            "Return ONLY a valid JSON value (no Markdown, no code fences). "
-                            f"Top-level keys MUST be: {field_names}."
-                        )
-                        fallback_messages = messages.copy()
-                        fallback_messages.insert(0, {"role": "system", "content": fallback_system})
-
-                        raw = self.llm.invoke(fallback_messages)
-                        raw_text = raw.content if hasattr(raw, "content") else str(raw)
-                        raw_text = _extract_json_object(raw_text)
-                        parsed = json.loads(raw_text)
-                        response = pydantic_obj.model_validate(parsed)
-                else:
-                    if self.model_version.startswith("deepseek"):
-                        structured_llm = self.llm.with_structured_output(ResponseWithThinkPydantic)
-                        response = structured_llm.invoke(messages)
-                        #print(response)
-                        # Extract the resposne without the think
-                        response = response.response
-                    else:
-                        response = self.llm.invoke(messages)
-                        response = response.content
-
-                # Calculate completion tokens
-                response_content = str(response)
-                completion_tokens = self.llm.get_num_tokens(response_content)
-                total_tokens = prompt_tokens + completion_tokens
-                
-                # Update statistics
-                self.total_prompt_tokens += prompt_tokens
-                self.total_completion_tokens += completion_tokens
-                self.total_tokens += total_tokens
-                
+                response = self._call_once(messages, pydantic_obj)
+
+                # Cache hits cost nothing, so they add no token usage.
+                if not cache_hit:
+                    self._record_usage(messages, response)
                 return response
                 
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'Throttling' or e.response['Error']['Code'] == 'TooManyRequestsException':
-                    retry_count += 1
-                    self.retry_count += 1
-                    
-                    if retry_count > max_retries:
-                        self.failed_calls += 1
-                        raise Exception(f"Maximum retries ({max_retries}) exceeded: {str(e)}")
-                    
-                    base_delay = 1.0
-                    max_delay = 60.0
-                    delay = min(max_delay, base_delay * (2 ** (retry_count - 1)))
-                    jitter = random.uniform(0, 0.1 * delay)
-                    sleep_time = delay + jitter
-                    
-                    print(f"ThrottlingException occurred: {str(e)}. Retrying in {sleep_time:.2f} seconds (attempt {retry_count}/{max_retries})")
-                    time.sleep(sleep_time)
-                else:
-                    self.failed_calls += 1
-                    raise e
+            except _RATE_LIMIT_ERRORS as e:
+                retry_count += 1
+                time.sleep(self._handle_throttle(e, retry_count, max_retries))
+            except Exception as e:
+                self.failed_calls += 1
+                raise e
+
+    async def ainvoke(self,
+                      user_prompt: str,
+                      system_prompt: Optional[str] = None,
+                      pydantic_obj: Optional[Type[BaseModel]] = None,
+                      max_retries: int = 10) -> Any:
+        """
+        Async counterpart of `invoke`: same prompts, fallback and retry policy,
+        but awaits the provider so many calls can be in flight at once.
+        """
+        self.total_calls += 1
+        messages = self._build_messages(user_prompt, system_prompt)
+        cache_hit: list = []
+        _CACHE_HIT.set(cache_hit)
+
+        retry_count = 0
+        while True:
+            wait = self._cooldown_remaining()
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                response = await self._acall_once(messages, pydantic_obj)
+
+                # Cache hits cost nothing, so they add no token usage.
+                if not cache_hit:
+                    self._record_usage(messages, response)
+                return response
+
+            except _RATE_LIMIT_ERRORS as e:
+                retry_count += 1
+                await asyncio.sleep(self._handle_throttle(e, retry_count, max_retries))
             except Exception as e:
                 self.failed_calls += 1
                 raise e
     
+    async def abatch(self,
+                     user_prompts: List[str],
+                     system_prompt: Optional[str] = None,
+                     pydantic_obj: Optional[Type[BaseModel]] = None,
+                     max_concurrency: int = 10,
+                     max_retries: int = 10) -> List[Any]:
+        """
+        Async counterpart of `batch_invoke`: runs `ainvoke` per prompt with at most
+        `max_concurrency` calls in flight, and returns the response or exception per
+        prompt, in order. Each call retries its own throttling errors.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(user_prompt: str) -> Any:
+            async with semaphore:
+                return await self.ainvoke(user_prompt, system_prompt, pydantic_obj, max_retries)
+
+        return await asyncio.gather(*(_one(p) for p in user_prompts), return_exceptions=True)
+
+    def _batch_once(self, batch_messages: List[List[dict]], pydantic_obj: Optional[Type[BaseModel]], config: dict) -> List[Any]:
+        # One `.batch` round over all prompts; each slot holds (response, cache_hit) or the exception raised for it.
+        def _one(messages: List[dict]) -> Any:
+            # `.batch` runs each input in its own context copy, so every prompt gets its own cache-hit flag.
+            cache_hit: list = []
+            token = _CACHE_HIT.set(cache_hit)
+            try:
+                return self._call_once(messages, pydantic_obj), bool(cache_hit)
+            finally:
+                _CACHE_HIT.reset(token)
+
+        return RunnableLambda(_one).batch(batch_messages, config=config, return_exceptions=True)
+
+    def batch_invoke(self,
+                     user_prompts: List[str],
+                     system_prompt: Optional[str] = None,
+                     pydantic_obj: Optional[Type[BaseModel]] = None,
+                     max_concurrency: int = 10,
+                     max_retries: int = 10) -> List[Any]:
+        """
+        Invoke the LLM on many prompts with up to `max_concurrency` requests in flight.
+
+        Args:
+            user_prompts: One user prompt per call
+            system_prompt: Optional system prompt shared by all calls
+            pydantic_obj: Optional Pydantic model for structured output
+            max_concurrency: Maximum number of concurrent requests
+            max_retries: Maximum number of retries for throttling errors
+
+        Returns:
+            One entry per prompt, in order: the response, or the exception that call
+            failed with (a single bad prompt does not sink the batch). Throttled prompts
+            are re-sent together with the same backoff as `invoke`.
+        """
+        self.total_calls += len(user_prompts)
+        batch_messages = [self._build_messages(p, system_prompt) for p in user_prompts]
+        config = {"max_concurrency": max_concurrency}
+
+        results: List[Any] = [None] * len(user_prompts)
+        pending = list(range(len(user_prompts)))
+        retry_count = 0
+        while pending:
+            wait = self._cooldown_remaining()
+            if wait:
+                time.sleep(wait)
+            outs = self._batch_once([batch_messages[i] for i in pending], pydantic_obj, config)
+            throttled = {}
+            for i, out in zip(pending, outs):
+                if _is_throttling(out):
+                    throttled[i] = out
+                elif isinstance(out, Exception):
+                    self.failed_calls += 1
+                    results[i] = out
+                else:
+                    response, cache_hit = out
+                    # Cache hits cost nothing, so they add no token usage.
+                    if not cache_hit:
+                        self._record_usage(batch_messages[i], response)
+                    results[i] = response
+            pending = list(throttled)
+            if not pending:
+                break
+
+            retry_count += 1
+            self.retry_count += len(pending)
+            if retry_count > max_retries:
+                self.failed_calls += len(pending)
+                for i, e in throttled.items():
+                    results[i] = Exception(f"Maximum retries ({max_retries}) exceeded: {str(e)}")
+                break
+            sleep_time = max(_throttle_delay(e, retry_count) for e in throttled.values())
+            self._start_cooldown(sleep_time)
+            print(f"ThrottlingException for {len(pending)} prompt(s). Retrying in {sleep_time:.2f} seconds (attempt {retry_count}/{max_retries})")
+            time.sleep(sleep_time)
+        return results
+
     def get_statistics(self) -> dict:
         """
         Get the current statistics of the LLM service.
@@ -171,6 +577,7 @@ class LLMService:
             "total_calls": self.total_calls,
             "failed_calls": self.failed_calls,
             "retry_count": self.retry_count,
+            "cache_hits": self.cache_hits,
             "total_prompt_tokens": self.total_prompt_tokens,
             "total_completion_tokens": self.total_completion_tokens,
             "total_tokens": self.total_tokens,
@@ -188,6 +595,7 @@ class LLMService:
         print(f"Total calls: {stats['total_calls']}")
         print(f"Failed calls: {stats['failed_calls']}")
         print(f"Total retries: {stats['retry_count']}")
+        print(f"Cache hits: {stats['cache_hits']}")
         print(f"Total prompt tokens: {stats['total_prompt_tokens']}")
         print(f"Total completion tokens: {stats['total_completion_tokens']}")
         print(f"Total tokens: {stats['total_tokens']}")
@@ -205,18 +613,41 @@ class GraphState(TypedDict):
     Reading_answers: Optional[dict[str, Any]]
 
 
+# Patterns for the text helpers below, compiled once at import.
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+_CAMEL_BOUNDARY_RE = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_ERROR_WORD_RE = re.compile(rb"error", re.IGNORECASE)
+_CASE_NAME_RE = re.compile(r'case name:\s*(.+)', re.IGNORECASE)
+_SUBTASKS_HEADER_RE = re.compile(r'splits into (\d+) subtasks:', re.IGNORECASE)
+_SUBTASK_RE = re.compile(r'subtask\d+:\s*(.*)', re.IGNORECASE)
+_FOAMFILE_CONTEXT_RE = re.compile(r'FoamFile\s*\{.*?(?=```|$)', re.DOTALL | re.IGNORECASE)
+_FILE_NAME_RE = re.compile(r'openfoam\s+(.*?)\s+foamfile', re.IGNORECASE)
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+_FOLDER_NAME_RE = re.compile(r'foamfile in\s+(.*?)\s+folder', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
 def tokenize(text: str) -> str:
+    # Identifiers repeat heavily across calls, so results are memoized.
     # Replace underscores with spaces
-    text = text.replace('_', ' ')
+    text = text.translate(_UNDERSCORE_TO_SPACE)
     # Insert a space between a lowercase letter and an uppercase letter (global match)
-    text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', text)
+    text = _CAMEL_BOUNDARY_RE.sub(' ', text)
     return text.lower()
 
-def save_file(path: str, content: str) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        f.write(content)
-    print(f"Saved file at {path}")
+def save_file(path: str, content: str, verbose: bool = True) -> None:
+    data = content.encode("utf-8")
+    # Create the parent directory only when the open fails, instead of os.makedirs
+    # (a stat per path component) on every call.
+    try:
+        f = open(path, 'wb')
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, 'wb')
+    with f:
+        f.write(data)
+    if verbose:
+        print(f"Saved file at {path}")
 
 def read_file(path: str) -> str:
     if os.path.exists(path):
@@ -225,13 +656,15 @@ def read_file(path: str) -> str:
     return ""
 
 def list_case_files(case_dir: str) -> str:
-    files = [f for f in os.listdir(case_dir) if os.path.isfile(os.path.join(case_dir, f))]
-    return ", ".join(files)
+    # scandir reports entry types from the directory listing, saving a stat per entry
+    with os.scandir(case_dir) as entries:
+        return ", ".join(entry.name for entry in entries if entry.is_file())
 
 def remove_files(directory: str, prefix: str) -> None:
-    for file in os.listdir(directory):
-        if file.startswith(prefix):
-            os.remove(os.path.join(directory, file))
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(prefix):
+                os.remove(entry.path)
     print(f"Removed files with prefix '{prefix}' in {directory}")
 
 def remove_file(path: str) -> None:
@@ -247,79 +680,86 @@ def remove_numeric_folders(case_dir: str) -> None:
     Args:
         case_dir (str): The directory path to process
     """
-    for item in os.listdir(case_dir):
-        item_path = os.path.join(case_dir, item)
-        if os.path.isdir(item_path) and item != "0":
+    with os.scandir(case_dir) as entries:
+        for entry in entries:
+            # Symlinks are skipped: rmtree refuses them anyway
+            if entry.name == "0" or not entry.is_dir(follow_symlinks=False):
+                continue
             try:
                 # Try to convert to float to check if it's a numeric value
-                float(item)
-                # If conversion succeeds, it's a numeric folder
-                try:
-                    shutil.rmtree(item_path)
-                    print(f"Removed numeric folder: {item_path}")
-                except Exception as e:
-                    print(f"Error removing folder {item_path}: {str(e)}")
+                float(entry.name)
             except ValueError:
                 # Not a numeric value, so we keep this folder
-                pass
+                continue
+            # If conversion succeeds, it's a numeric folder
+            try:
+                shutil.rmtree(entry.path)
+                print(f"Removed numeric folder: {entry.path}")
+            except Exception as e:
+                print(f"Error removing folder {entry.path}: {str(e)}")
 
 def check_foam_errors(directory: str) -> list:
     error_logs = []
-    # DOTALL mode allows '.' to match newline characters
-    pattern = re.compile(r"ERROR:(.*)", re.DOTALL)
-    
-    for file in os.listdir(directory):
-        if file.startswith("log"):
-            filepath = os.path.join(directory, file)
-            with open(filepath, 'r') as f:
-                content = f.read()
-            
-            match = pattern.search(content)
-            if match:
-                error_content = match.group(0).strip()
-                error_logs.append({"file": file, "error_content": error_content})
-            elif "error" in content.lower():
-                print(f"Warning: file {file} contains 'error' but does not match expected format.")
+    # Logs can be large: search the memory-mapped bytes and decode only the error part,
+    # i.e. everything from the first "ERROR:" to the end of the file.
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not (entry.name.startswith("log") and entry.is_file()):
+                continue
+            if entry.stat().st_size == 0:  # empty files cannot be mapped (and hold no errors)
+                continue
+            with open(entry.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = mm.find(b"ERROR:")
+                if start != -1:
+                    error_content = mm[start:].decode("utf-8", errors="replace")
+                    # Match text-mode reads: universal newlines
+                    error_content = error_content.replace("\r\n", "\n").replace("\r", "\n").strip()
+                    error_logs.append({"file": entry.name, "error_content": error_content})
+                elif _ERROR_WORD_RE.search(mm):
+                    print(f"Warning: file {entry.name} contains 'error' but does not match expected format.")
     return error_logs
 
 def extract_commands_from_allrun_out(out_file: str) -> list:
     commands = []
     if not os.path.exists(out_file):
         return commands
+    append = commands.append
     with open(out_file, 'r') as f:
         for line in f:
             if line.startswith("Running "):
-                parts = line.split(" ")
-                if len(parts) > 1:
-                    commands.append(parts[1].strip())
+                # The command is the word after "Running "; partition avoids splitting the whole line
+                append(line[8:].partition(" ")[0].strip())
     return commands
 
 def parse_case_name(text: str) -> str:
-    match = re.search(r'case name:\s*(.+)', text, re.IGNORECASE)
+    match = _CASE_NAME_RE.search(text)
     return match.group(1).strip() if match else "default_case"
 
 def split_subtasks(text: str) -> list:
-    header_match = re.search(r'splits into (\d+) subtasks:', text, re.IGNORECASE)
+    header_match = _SUBTASKS_HEADER_RE.search(text)
     if not header_match:
         print("Warning: No subtasks header found in the response.")
         return []
     num_subtasks = int(header_match.group(1))
-    subtasks = re.findall(r'subtask\d+:\s*(.*)', text, re.IGNORECASE)
+    subtasks = _SUBTASK_RE.findall(text)
     if len(subtasks) != num_subtasks:
         print(f"Warning: Expected {num_subtasks} subtasks but found {len(subtasks)}.")
     return subtasks
 
 # 截取 </think> 之后的内容
 def remove_think_tags(text: str) -> str:
-    think_end_idx = str(text).find("</think>")
-    if think_end_idx != -1:
-        text = text[think_end_idx + len("</think>") :]
+    if not isinstance(text, str):
+        # e.g. a chat message object: use its text rather than the whole repr
+        text = text.content if hasattr(text, "content") else str(text)
+    _, sep, tail = text.partition("</think>")
+    if sep:
         print("已去除 </think> 及之前的内容")
+        return tail
     return text
 
 def parse_context(text: str) -> str:
     text = remove_think_tags(text)
-    match = re.search(r'FoamFile\s*\{.*?(?=```|$)', text, re.DOTALL | re.IGNORECASE)
+    match = _FOAMFILE_CONTEXT_RE.search(text)
     if match:
         return match.group(0).strip()
     
@@ -329,28 +769,32 @@ def parse_context(text: str) -> str:
 
 def parse_file_name(subtask: str) -> str:
     subtask = remove_think_tags(subtask)    
-    match = re.search(r'openfoam\s+(.*?)\s+foamfile', subtask, re.IGNORECASE)
+    match = _FILE_NAME_RE.search(subtask)
     return match.group(1).strip() if match else ""
 
 def parse_json_content(subtask: str, ) -> str:
     subtask_nothink = remove_think_tags(subtask)    
-    match = re.search(r'```(?:json)?\s*(.*?)\s*```', subtask_nothink, re.DOTALL)
+    match = _JSON_FENCE_RE.search(subtask_nothink)
     return match.group(1).strip() if match else subtask_nothink
 
 def parse_folder_name(subtask: str) -> str:
     subtask = remove_think_tags(subtask)    
-    match = re.search(r'foamfile in\s+(.*?)\s+folder', subtask, re.IGNORECASE)
+    match = _FOLDER_NAME_RE.search(subtask)
     return match.group(1).strip() if match else ""
 
+_INPUT_FILE_END = "input_file_end."
+
+
 def find_similar_file(description: str, tutorial: str) -> str:
+    # Two str.find calls, the second resuming at the match, cover the text once and are
+    # faster than an equivalent lazy regex (which steps through the block char by char).
     start_pos = tutorial.find(description)
     if start_pos == -1:
         return "None"
-    end_marker = "input_file_end."
-    end_pos = tutorial.find(end_marker, start_pos)
+    end_pos = tutorial.find(_INPUT_FILE_END, start_pos)
     if end_pos == -1:
         return "None"
-    return tutorial[start_pos:end_pos + len(end_marker)]
+    return tutorial[start_pos:end_pos + len(_INPUT_FILE_END)]
 
 def read_commands(file_path: str) -> str:
     if not os.path.exists(file_path):
@@ -1,24 +1,63 @@
 import argparse
-import json
-from dataclasses import dataclass
+import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+try:
+    import ijson
+except ImportError:  # reports are then loaded whole
+    ijson = None
 
-@dataclass(frozen=True)
-class ItemSummary:
-    type: str  # "cloze" | "reading"
-    source: str
-    name: str
-    score: float
-    aspect_scores: Optional[Dict[str, float]]
-    ai_accuracy: Optional[float]
-    ai_correct: Optional[int]
-    ai_total: Optional[int]
 
+def _add_src_to_path() -> None:
+    repo_root = Path(__file__).resolve().parent
+    sys.path.insert(0, str(repo_root / "src"))
 
-def _read_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+
+_add_src_to_path()
+
+from services.json_io import dump_json, read_json  # noqa: E402
+
+# Top-level report fields read by `summarize_report`; review_quality writes them before "items".
+_REPORT_META_KEYS = ("generated_at", "model", "settings")
+
+
+def _iter_report_items(path: Path) -> Iterator[Any]:
+    with path.open("rb") as f:
+        yield from ijson.items(f, "items.item", use_float=True)
+
+
+def _read_report_meta(path: Path) -> Dict[str, Any]:
+    # One pass over the top-level keys, stopping at "items" (the last key review_quality writes),
+    # so the items are not parsed here and absent keys cost nothing extra.
+    meta: Dict[str, Any] = {}
+    key, builder = None, None
+    with path.open("rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == "" and event in ("map_key", "end_map"):
+                if builder is not None:
+                    meta[key] = builder.value
+                if value == "items":
+                    break
+                key, builder = value, (ijson.ObjectBuilder() if value in _REPORT_META_KEYS else None)
+            elif builder is not None:
+                builder.event(event, value)
+    return meta
+
+
+def read_report(path: Path) -> Tuple[Dict[str, Any], Iterable[Any]]:
+    """
+    Load a quality report as (report fields without "items", items).
+
+    With ijson installed the items are streamed from disk one at a time, so a large
+    report is never held in memory as a whole; otherwise the report is read in full.
+    """
+    if ijson is None:
+        report = read_json(path)
+        items = report.get("items")
+        return report, items if isinstance(items, list) else []
+
+    return _read_report_meta(path), _iter_report_items(path)
 
 
 def _safe_float(x: Any) -> Optional[float]:
@@ -86,10 +125,31 @@ def _extract_aspect_scores(item: Dict[str, Any]) -> Optional[Dict[str, float]]:
     return out or None
 
 
-def summarize_report(report: Dict[str, Any]) -> Dict[str, Any]:
-    items = report.get("items") if isinstance(report.get("items"), list) else []
+def _avg(xs: List[float]) -> float:
+    return (sum(xs) / len(xs)) if xs else 0.0
 
-    item_summaries: List[ItemSummary] = []
+
+def _avg_aspects(sums: Dict[str, float], counts: Dict[str, int]) -> Optional[Dict[str, float]]:
+    # Average each aspect across the items that contain it.
+    if not sums:
+        return None
+    return {k: sums[k] / counts[k] for k in sorted(sums)}
+
+
+def summarize_report(report: Dict[str, Any], items: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+    # `items` is consumed once, so it may be a stream (see `read_report`); default: report["items"].
+    if items is None:
+        items = report.get("items") if isinstance(report.get("items"), list) else []
+
+    # Everything is folded in during the single pass over items. Scores/accuracies are
+    # still collected per type and reduced with sum() at the end, which keeps the averages
+    # bit-identical (sum() of floats is compensated; a running += is not). Aspect scores
+    # are 0-10 integers, so a running sum per aspect is exact and needs no list.
+    per_passage: List[Dict[str, Any]] = []
+    scores: Dict[str, List[float]] = {"cloze": [], "reading": []}
+    accs: Dict[str, List[float]] = {"cloze": [], "reading": []}
+    aspect_sums: Dict[str, Dict[str, float]] = {"cloze": {}, "reading": {}}
+    aspect_counts: Dict[str, Dict[str, int]] = {"cloze": {}, "reading": {}}
     for it in items:
         if not isinstance(it, dict):
             continue
@@ -106,73 +166,47 @@ def summarize_report(report: Dict[str, Any]) -> Dict[str, Any]:
         score = _safe_float(it.get("score")) or 0.0
         aspect_scores = _extract_aspect_scores(it)
         acc, correct, total = _compute_ai_accuracy(it)
-        item_summaries.append(
-            ItemSummary(
-                type=t,
-                source=source,
-                name=name,
-                score=score,
-                aspect_scores=aspect_scores,
-                ai_accuracy=acc,
-                ai_correct=correct,
-                ai_total=total,
-            )
-        )
-
-    def _avg(xs: List[float]) -> float:
-        return (sum(xs) / len(xs)) if xs else 0.0
-
-    cloze_items = [x for x in item_summaries if x.type == "cloze"]
-    reading_items = [x for x in item_summaries if x.type == "reading"]
-
-    cloze_scores = [x.score for x in cloze_items]
-    reading_scores = [x.score for x in reading_items]
 
-    cloze_accs = [x.ai_accuracy for x in cloze_items if x.ai_accuracy is not None]
-    reading_accs = [x.ai_accuracy for x in reading_items if x.ai_accuracy is not None]
+        scores[t].append(score)
+        if acc is not None:
+            accs[t].append(acc)
+        if aspect_scores:
+            sums, counts = aspect_sums[t], aspect_counts[t]
+            for k, v in aspect_scores.items():
+                sums[k] = sums.get(k, 0.0) + v
+                counts[k] = counts.get(k, 0) + 1
 
-    def _avg_aspects(items_: List[ItemSummary]) -> Optional[Dict[str, float]]:
-        # Average each aspect across items that contain it.
-        bucket: Dict[str, List[float]] = {}
-        for it in items_:
-            if not it.aspect_scores:
-                continue
-            for k, v in it.aspect_scores.items():
-                bucket.setdefault(k, []).append(float(v))
-        if not bucket:
-            return None
-        return {k: _avg(vs) for k, vs in sorted(bucket.items(), key=lambda x: x[0])}
+        per_passage.append(
+            {
+                "type": t,  # "cloze" | "reading"
+                "source": source,
+                "name": name,
+                "score": score,
+                "aspect_scores": aspect_scores,
+                "ai_accuracy": acc,
+                "ai_correct": correct,
+                "ai_total": total,
+            }
+        )
 
     summary = {
         "generated_at": report.get("generated_at"),
         "model": report.get("model"),
         "source_settings": report.get("settings", {}),
         "counts": {
-            "cloze": len(cloze_items),
-            "reading": len(reading_items),
-            "total": len(item_summaries),
+            "cloze": len(scores["cloze"]),
+            "reading": len(scores["reading"]),
+            "total": len(per_passage),
         },
         "overall": {
-            "cloze_avg_score": _avg(cloze_scores),
-            "reading_avg_score": _avg(reading_scores),
-            "cloze_avg_aspect_scores": _avg_aspects(cloze_items),
-            "reading_avg_aspect_scores": _avg_aspects(reading_items),
-            "cloze_avg_ai_accuracy": _avg([x for x in cloze_accs if x is not None]) if cloze_accs else None,
-            "reading_avg_ai_accuracy": _avg([x for x in reading_accs if x is not None]) if reading_accs else None,
+            "cloze_avg_score": _avg(scores["cloze"]),
+            "reading_avg_score": _avg(scores["reading"]),
+            "cloze_avg_aspect_scores": _avg_aspects(aspect_sums["cloze"], aspect_counts["cloze"]),
+            "reading_avg_aspect_scores": _avg_aspects(aspect_sums["reading"], aspect_counts["reading"]),
+            "cloze_avg_ai_accuracy": _avg(accs["cloze"]) if accs["cloze"] else None,
+            "reading_avg_ai_accuracy": _avg(accs["reading"]) if accs["reading"] else None,
         },
-        "per_passage": [
-            {
-                "type": x.type,
-                "source": x.source,
-                "name": x.name,
-                "score": x.score,
-                "aspect_scores": x.aspect_scores,
-                "ai_accuracy": x.ai_accuracy,
-                "ai_correct": x.ai_correct,
-                "ai_total": x.ai_total,
-            }
-            for x in item_summaries
-        ],
+        "per_passage": per_passage,
     }
     return summary
 
@@ -189,16 +223,16 @@ def main() -> int:
         parser.error("Please provide a report path (positional) or via --report.")
 
     report_path = Path(report_arg)
-    report = _read_json(report_path)
-    summary = summarize_report(report)
+    report, items = read_report(report_path)
+    summary = summarize_report(report, items)
 
     if args.out:
         out_path = Path(args.out)
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+        out_path.write_bytes(dump_json(summary))
         print(f"Saved summary: {out_path}")
     else:
-        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        print(dump_json(summary).decode("utf-8"))
 
     return 0
 